@@ -6,14 +6,11 @@ import re
 import sys
 from asyncio import wait_for
 from codecs import lookup
-from copy import deepcopy
 from functools import partial
 from gzip import decompress as gzip_decompress
 from http import cookies
-from io import IOBase
 from json import dumps as json_dumps
 from json import loads
-from os.path import basename
 from random import randint
 from ssl import SSLContext
 from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
@@ -21,9 +18,14 @@ from urllib.parse import ParseResult, urlencode
 from zlib import decompress as zlib_decompress
 
 from charset_normalizer import detect
+from onecache import CacheDecorator
 
 from aiosonic import http_parser
-from aiosonic.connection import Connection, get_default_ssl_context
+from aiosonic.connection import (
+    Connection,
+    _get_shared_ssl_context,
+    get_default_ssl_context,  # noqa: F401  # re-exported
+)
 from aiosonic.connectors import TCPConnector
 from aiosonic.exceptions import (
     ConnectionDisconnected,
@@ -35,7 +37,7 @@ from aiosonic.exceptions import (
     RequestTimeout,
     TimeoutException,
 )
-from aiosonic.multipart import MultipartForm
+from aiosonic.multipart import RANDOM_RANGE, MultipartForm
 from aiosonic.proxy import Proxy
 from aiosonic.resolver import get_loop
 from aiosonic.timeout import Timeouts
@@ -51,12 +53,31 @@ _HTTP_RESPONSE_STATUS_LINE = re.compile(
     r"HTTP/(?P<version>(\d.)?(\d)) (?P<code>\d+) (?P<reason>[\w]*)"
 )
 _CHARSET_RGX = re.compile(r"charset=(?P<charset>[\w-]*);?")
-_CHUNK_SIZE = 1024 * 4  # 4kilobytes
 _NEW_LINE = "\r\n"
+_CRLF = b"\r\n"
+_LAST_CHUNK = b"0\r\n\r\n"
+_PROXY_CONNECT_TEMPLATE = (
+    "CONNECT {host} HTTP/1.1\r\n"
+    "HOST: {host}\r\n"
+    "Proxy-Connection: keep-alive\r\n"
+    "{proxy_auth}\r\n"
+)
+_USER_AGENT = f"aiosonic/{VERSION}"
 dlogger = get_debug_logger()
-RANDOM_RANGE = (10**8, 10**9)
 
-REPLACEABLE_HEADERS = {"host", "user-agent"}
+REPLACEABLE_HEADERS = http_parser.REPLACEABLE_HEADERS
+_DEFAULT_PORTS = frozenset((80, 443))
+_REDIRECT_CODES = frozenset((301, 302))
+
+if sys.version_info >= (3, 11):
+
+    async def _wait_for(coro, timeout):
+        """Like `asyncio.wait_for`, without wrapping `coro` in a new task."""
+        async with asyncio.timeout(timeout):
+            return await coro
+
+else:
+    _wait_for = wait_for
 
 
 # Classes
@@ -68,11 +89,11 @@ class HttpHeaders(CaseInsensitiveDict):
     @staticmethod
     def _clear_line(line: bytes):
         """Clear readed line."""
-        decoded = line.rstrip().decode()
-        pair = decoded.split(": ", 1)
-        if len(pair) < 2:
-            return decoded.split(":")
-        return pair
+        # split on bytes, only name and value get decoded
+        name, _, value = line.rstrip().partition(b":")
+        if value[:1] == b" ":
+            value = value[1:]
+        return [name.decode(), value.decode()]
 
 
 #: Headers
@@ -104,7 +125,26 @@ class HttpResponse:
 
     def _set_response_initial(self, data: bytes):
         """Parse first bytes from http response."""
-        res = re.match(_HTTP_RESPONSE_STATUS_LINE, data.decode().rstrip("\r\n"))
+        # fast path for the usual "HTTP/1.1 200 OK" shape, same result as
+        # the regex below without running it
+        if data[8:9] == b" " and data[12:13] == b" " and data[:5] == b"HTTP/":
+            version = data[5:8]
+            code = data[9:12]
+            reason = data[13:].rstrip(b"\r\n")
+            if (
+                version[:1].isdigit()
+                and version[2:].isdigit()
+                and code.isdigit()
+                and (reason.isalpha() or not reason)
+            ):
+                self.response_initial = {
+                    "version": version.decode(),
+                    "code": code.decode(),
+                    "reason": reason.decode(),
+                }
+                return
+
+        res = _HTTP_RESPONSE_STATUS_LINE.match(data.decode().rstrip("\r\n"))
         assert res
         self.response_initial = res.groupdict()
 
@@ -113,8 +153,8 @@ class HttpResponse:
         self.headers[key] = val
         self.raw_headers.append((key, val))
 
-    async def _set_response_headers(self, iterator):
-        async for header_data in iterator:
+    def _set_response_headers(self, lines: List[bytes]):
+        for header_data in lines:
             header_tuple = HttpHeaders._clear_line(header_data)
             self._set_header(*header_tuple)
 
@@ -165,11 +205,8 @@ class HttpResponse:
 
     def _get_encoding(self) -> str:
         ctype = self.headers.get("content-type", "").lower()
-        res = re.findall(_CHARSET_RGX, ctype)
-        encoding = ""
-
-        if res:
-            encoding = res[0]
+        match = _CHARSET_RGX.search(ctype)
+        encoding = match.group("charset") if match else ""
 
         if encoding:
             try:
@@ -191,10 +228,10 @@ class HttpResponse:
     async def content(self) -> bytes:
         """Read response body."""
         if self.chunked and not self.body:
-            res = b""
+            res = bytearray()
             async for chunk in self.read_chunks():
                 res += chunk
-            self._set_body(res)
+            self._set_body(bytes(res))
         return self.body
 
     async def text(self) -> str:
@@ -238,10 +275,15 @@ class HttpResponse:
         self.request_meta = {"from_path": urlparsed.path or "/"}
 
 
+@CacheDecorator(512)
 def _get_hostname(hostname_arg, port):
+    """Get Host header value, idna encoded.
+
+    With CacheDecorator as idna encoding is costly and hosts repeat a lot.
+    """
     hostname = hostname_arg.encode("idna").decode()
 
-    if port not in [80, 443]:
+    if port not in _DEFAULT_PORTS:
         hostname += ":" + str(port)
     return hostname
 
@@ -278,36 +320,26 @@ def _prepare_request_headers(
     port = url.port or (443 if url.scheme == "https" else 80)
     hostname = _get_hostname(url.hostname, port)
 
-    headers_base = []
+    # base headers go first, so they can be listed as is, without going
+    # through add_headers and its replace lookups
     if http2conn:
-        http_parser.add_headers(
-            headers_base,
-            {
-                ":method": method,
-                ":authority": hostname.split(":")[0],
-                ":scheme": "https",
-                ":path": path,
-                "user-agent": f"aiosonic/{VERSION}",
-            },
-        )
+        headers_base = [
+            (":method", method),
+            (":authority", hostname.split(":")[0]),
+            (":scheme", "https"),
+            (":path", path),
+            ("user-agent", _USER_AGENT),
+        ]
     else:
-        http_parser.add_headers(
-            headers_base,
-            {
-                "HOST": hostname,
-                "Connection": "keep-alive",
-                "User-Agent": f"aiosonic/{VERSION}",
-            },
-        )
+        headers_base = [
+            ("HOST", hostname),
+            ("Connection", "keep-alive"),
+            ("User-Agent", _USER_AGENT),
+        ]
 
     if proxy and proxy.auth and url.scheme == "http":
-        http_parser.add_headers(
-            headers_base,
-            {
-                "Proxy-Connection": "keep-alive",
-                "Proxy-Authorization": f"Basic {proxy.auth.decode()}",
-            },
-        )
+        headers_base.append(("Proxy-Connection", "keep-alive"))
+        headers_base.append(("Proxy-Authorization", proxy.auth_header))
 
     if multipart:
         http_parser.add_header(
@@ -322,8 +354,10 @@ def _prepare_request_headers(
     if http2conn:
         return headers_base
 
+    lines = [get_base]
     for key, data in http_parser.headers_iterator(headers_base):
-        get_base += f"{key}: {data}{_NEW_LINE}"
+        lines.append(f"{key}: {data}{_NEW_LINE}")
+    get_base = "".join(lines)
 
     # log request headers
     if dlogger.level == logging.DEBUG:
@@ -338,7 +372,7 @@ def _handle_chunk(chunk: bytes, connection: Connection):
     if not connection.writer:
         raise MissingWriterException("missing writer in connection")
 
-    connection.write(chunk_size.encode() + chunk + _NEW_LINE.encode())
+    connection.write(chunk_size.encode() + chunk + _CRLF)
 
 
 async def _send_chunks(connection: Connection, body: BodyType):
@@ -354,60 +388,23 @@ async def _send_chunks(connection: Connection, body: BodyType):
 
     if not connection.writer:
         raise MissingWriterException("missing writer in connection")
-    connection.write(("0" + _NEW_LINE * 2).encode())
+    connection.write(_LAST_CHUNK)
 
 
 async def _send_multipart(
     data: Dict[str, str],
     boundary: str,
     headers: HeadersType,
-    chunk_size: int = _CHUNK_SIZE,
 ) -> bytes:
-    """Send multipart data by streaming."""
-    # TODO: precalculate body size and stream request
-    # precalculate file sizes by os.path.getsize
-
-    to_send = b""
+    """Build multipart body of dict data, same format as MultipartForm."""
+    form = MultipartForm()
+    form.boundary = boundary
     for key, val in data.items():
-        # write --boundary + field
-        to_send += (f"--{boundary}{_NEW_LINE}").encode()
-
-        if isinstance(val, IOBase):
-            # TODO: Utility to accept files with multipart metadata
-            # (Content-Type, custom filename, ...),
-
-            # write Contet-Disposition
-            to_write = (
-                "Content-Disposition: form-data; "
-                + 'name="%s"; filename="%s"%s%s'
-                % (
-                    key,
-                    basename(val.name),
-                    _NEW_LINE,
-                    _NEW_LINE,
-                )
-            )
-            to_send += to_write.encode()
-
-            # read and write chunks
-            loop = get_loop()
-            while True:
-                data = await loop.run_in_executor(None, val.read, chunk_size)
-                if not data:
-                    break
-                to_send += data
-            val.close()
-
-        else:
-            to_send += (
-                f'Content-Disposition: form-data; name="{key}"{_NEW_LINE}{_NEW_LINE}'
-            ).encode()
-            to_send += val.encode() + _NEW_LINE.encode()
+        form.add_field(key, val)
 
-    # write --boundary-- for finish
-    to_send += (f"--{boundary}--").encode()
-    http_parser.add_header(headers, "Content-Length", str(len(to_send)))
-    return to_send
+    body, size = await form.get_body_size()
+    http_parser.add_header(headers, "Content-Length", str(size))
+    return body
 
 
 async def _do_request(
@@ -436,10 +433,10 @@ async def _do_request(
 
         if proxy and urlparsed.scheme == "https" and not connection.proxy_connected:
             await _proxy_connect(
-                connection, proxy, urlparsed, ssl or get_default_ssl_context()
+                connection, proxy, urlparsed, ssl or _get_shared_ssl_context()
             )
 
-        to_send = headers_data(connection=connection)
+        to_send = headers_data(url=urlparsed, connection=connection)
 
         if connection.h2conn:
             return await connection.http2_request(to_send, body)
@@ -462,12 +459,11 @@ async def _do_request(
         response = HttpResponse()
         response._set_request_meta(urlparsed)
 
-        # get response code and version
+        # get response code, version and headers
         try:
-            line = await wait_for(connection.readuntil(), timeouts.sock_read)
-            if not line:
-                raise HttpParsingError(f"response line parsing error: {line}")
-            response._set_response_initial(line)
+            lines = await _wait_for(
+                http_parser.read_response_head(connection), timeouts.sock_read
+            )
         except asyncio.IncompleteReadError as exc:
             connection.keep = False
             raise ConnectionDisconnected()
@@ -475,14 +471,15 @@ async def _do_request(
         except TimeoutException:
             raise ReadTimeout()
 
-        # reading headers
-        await response._set_response_headers(
-            http_parser.parse_headers_iterator(connection)
-        )
+        if not lines[0]:
+            raise HttpParsingError(f"response line parsing error: {lines[0]}")
+        response._set_response_initial(lines[0])
+        response._set_response_headers(lines[1:])
 
+        # header values are case insensitive tokens (RFC 9110)
         size = response.headers.get("content-length")
-        chunked = response.headers.get("transfer-encoding", "") == "chunked"
-        keepalive = "close" not in response.headers.get("connection", "")
+        chunked = response.headers.get("transfer-encoding", "").lower() == "chunked"
+        keepalive = "close" not in response.headers.get("connection", "").lower()
         response.compressed = response.headers.get("content-encoding", "")
 
         if size:
@@ -721,7 +718,8 @@ class HTTPClient:
             * **follow**: parameter to indicate whether to follow redirects
             * **http2**: flag to indicate whether to use http2 (experimental)
         """
-        headers = deepcopy(headers) if headers else HttpHeaders()
+        # one shallow copy is enough, header names and values are immutable
+        headers = HttpHeaders(headers) if headers else HttpHeaders()
 
         if json is not None:
             if data is not None and data != b"":
@@ -732,7 +730,8 @@ class HTTPClient:
         urlparsed = http_parser.get_url_parsed(url)
 
         boundary = None
-        headers = HttpHeaders(deepcopy(headers)) if headers else []
+        if not headers:
+            headers = []
         body: ParsedBodyType = b""
 
         if self.handle_cookies:
@@ -757,19 +756,19 @@ class HTTPClient:
         # if class or request method has false, it will be false
         verify_ssl = verify and self.verify_ssl
         reconnect_times = 3
+        # same for every retry and redirect, url is given by _do_request
+        headers_data = partial(
+            _prepare_request_headers,
+            method=method,
+            headers=headers,
+            params=params,
+            multipart=multipart,
+            boundary=boundary,
+            proxy=self.proxy,
+        )
         while reconnect_times > 0:
-            headers_data = partial(
-                _prepare_request_headers,
-                url=urlparsed,
-                method=method,
-                headers=headers,
-                params=params,
-                multipart=multipart,
-                boundary=boundary,
-                proxy=self.proxy,
-            )
             try:
-                response = await wait_for(
+                response = await _wait_for(
                     _do_request(
                         urlparsed,
                         headers_data,
@@ -788,7 +787,7 @@ class HTTPClient:
                 if self.handle_cookies:
                     self._save_new_cookies(str(urlparsed.hostname), response)
 
-                if follow and response.status_code in {301, 302}:
+                if follow and response.status_code in _REDIRECT_CODES:
                     max_redirects -= 1
 
                     if max_redirects == 0:
@@ -834,11 +833,13 @@ class HTTPClient:
         """Add cookies to request."""
         host_cookies = self.cookies_map.get(host)
         if host_cookies and not any(
-            [header.lower() == "cookie" for header, _ in headers]
+            header.lower() == "cookie"
+            for header, _ in http_parser.headers_iterator(headers)
         ):
             cookies_str = host_cookies.output(header="Cookie:")
             for cookie_data in cookies_str.split("\r\n"):
-                http_parser.add_header(headers, *cookie_data.split(": ", 1))
+                key, _, value = cookie_data.partition(": ")
+                http_parser.add_header(headers, key, value)
 
     def _save_new_cookies(self, host: str, response: HttpResponse):
         """Save new cookies in map."""
@@ -853,22 +854,27 @@ async def _proxy_connect(
 
     port = desturl.port or (443 if desturl.scheme == "https" else 80)
     hostname = _get_hostname(desturl.hostname, port)
-    to_send = f"CONNECT {hostname}:{port} HTTP/1.1{_NEW_LINE}"
-    to_send += f"HOST: {hostname}:{port}{_NEW_LINE}"
-    to_send += f"Proxy-Connection: keep-alive{_NEW_LINE}"
-    if proxy.auth:
-        to_send += f"Proxy-Authorization: Basic {proxy.auth.decode()}{_NEW_LINE}"
-    to_send += _NEW_LINE
-
-    assert connection.writer
+    proxy_auth = (
+        f"Proxy-Authorization: {proxy.auth_header}{_NEW_LINE}" if proxy.auth else ""
+    )
+    to_send = _PROXY_CONNECT_TEMPLATE.format(
+        host=f"{hostname}:{port}", proxy_auth=proxy_auth
+    )
+
+    # no drain, the request is tiny and reading the response yields to the
+    # loop, which flushes it
     connection.write(to_send.encode())
-    await connection.writer.drain()
 
-    connect_response = await connection.read(4096)
-    if b"200 Connection established" not in connect_response:
+    # consume the whole response head at once, so nothing of it is left in
+    # the reader when the tls handshake starts
+    try:
+        lines = await http_parser.read_response_head(connection)
+    except asyncio.IncompleteReadError as exc:
+        lines = [exc.partial]
+    if b"200 Connection established" not in lines[0]:
         connection.close()
         raise ConnectionError(
-            f"Failed to establish connection through proxy: {connect_response}"
+            f"Failed to establish connection through proxy: {lines[0]}"
         )
 
     if sys.version_info >= (3, 11):
@@ -3,7 +3,7 @@
 import ssl
 from asyncio import StreamReader, StreamWriter, open_connection
 from ssl import SSLContext
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from urllib.parse import ParseResult
 
 import h2.config
@@ -140,7 +140,7 @@ class Connection:
             self.close()
 
             if urlparsed.scheme == "https":
-                ssl_context = ssl_context or get_default_ssl_context(verify, http2)
+                ssl_context = ssl_context or _get_shared_ssl_context(verify, http2)
             else:
                 del dns_info_copy["server_hostname"]
             port = urlparsed.port or (443 if urlparsed.scheme == "https" else 80)
@@ -197,10 +197,14 @@ class Connection:
                 pass
 
             self.reader, self.writer = None, None
+        if self.h2handler:
+            # it holds the old writer and reader, don't let it be reused
+            self.h2handler.cleanup()
+        self.h2conn, self.h2handler = None, None
         self.proxy_connected = False
 
     async def upgrade(self, ssl_context: SSLContext = None):
-        ssl_context = ssl_context or get_default_ssl_context(self._verify)
+        ssl_context = ssl_context or _get_shared_ssl_context(self._verify)
         if not self.writer:
             raise MissingWriterException()
         await self.writer.start_tls(ssl_context)
@@ -243,6 +247,25 @@ def get_default_ssl_context(verify=True, http2=False):
     return ssl_context
 
 
+# default contexts used by connections, created once per (verify, http2) pair
+_ssl_contexts: Dict[Tuple[bool, bool], SSLContext] = {}
+
+
+def _get_shared_ssl_context(verify=True, http2=False):
+    """Get the default ssl context shared by all connections.
+
+    Building a context loads the system CA certificates, so it is done only
+    once. It is never handed out to users, who get a fresh one from
+    :func:`get_default_ssl_context` and may modify it freely.
+    """
+    ssl_context = _ssl_contexts.get((verify, http2))
+    if ssl_context is None:
+        ssl_context = _ssl_contexts[(verify, http2)] = get_default_ssl_context(
+            verify, http2
+        )
+    return ssl_context
+
+
 def _get_http2_ssl_context():
     """
     This function creates an SSLContext object that is suitably configured for
@@ -1,8 +1,9 @@
 """Connector stuffs."""
 import random
+from asyncio import Task, shield
 from asyncio import sleep as asyncio_sleep
 from asyncio import wait_for
-from typing import TYPE_CHECKING, Coroutine
+from typing import TYPE_CHECKING, Coroutine, Dict, Optional, Tuple
 from urllib.parse import ParseResult
 
 # import h2.connection (unused)
@@ -16,12 +17,23 @@ from aiosonic.exceptions import (
     TimeoutException,
 )
 from aiosonic.pools import SmartPool
-from aiosonic.resolver import DefaultResolver
+from aiosonic.resolver import DefaultResolver, get_loop
 from aiosonic.timeout import Timeouts
 
 if TYPE_CHECKING:
     from aiosonic.connection import Connection
 
+# dns caches shared by connectors using the default resolver, by ttl
+_dns_caches: Dict[int, ExpirableCache] = {}
+
+
+def get_default_dns_cache(ttl: int) -> ExpirableCache:
+    """Get the process wide dns cache for the given ttl."""
+    cache = _dns_caches.get(ttl)
+    if cache is None:
+        cache = _dns_caches[ttl] = ExpirableCache(512, ttl)
+    return cache
+
 
 class TCPConnector:
     """TCPConnector.
@@ -35,8 +47,12 @@ class TCPConnector:
         * **pool_cls**: pool class to be used. default: :class:`aiosonic.pools.SmartPool`
         * **resolver**: resolver to be used. default: :class:`aiosonic.resolver.DefaultResolver`
         * **ttl_dns_cache**: ttl in milliseconds for dns cache. default: `10000` 10 seconds
-        * **use_dns_cache**: Flag to indicate usage of dns cache. default: `True`
+        * **use_dns_cache**: Flag to indicate usage of dns cache. default: `True`.
+          Connectors using the default resolver share the cache with each other.
         * **conn_max_requests**: Max requests allowed for a connection. default: `100`
+        * **burst_limit**: if provided, `pool_size` is a soft limit and up to `burst_limit`
+          connections are opened when the pool is exhausted, instead of waiting for a free one.
+          Extra connections are closed on release. default: `None`
     """
 
     def __init__(
@@ -49,19 +65,28 @@ class TCPConnector:
         ttl_dns_cache=10000,
         use_dns_cache=True,
         conn_max_requests=100,
+        burst_limit: Optional[int] = None,
     ):
         from aiosonic.connection import Connection  # avoid circular dependency
 
         self.pool_size = pool_size
         connection_cls = connection_cls or Connection
         pool_cls = pool_cls or SmartPool
-        self.pool = pool_cls(self, pool_size, connection_cls)
+        pool_kwargs = {"burst_limit": burst_limit} if burst_limit else {}
+        self.pool = pool_cls(self, pool_size, connection_cls, **pool_kwargs)
         self.timeouts = timeouts or Timeouts()
         self.resolver = resolver or DefaultResolver()
         self.use_dns_cache = use_dns_cache
         self.conn_max_requests = conn_max_requests
+        self.cache: Optional[ExpirableCache] = None
         if self.use_dns_cache:
-            self.cache = ExpirableCache(512, ttl_dns_cache)
+            # a custom resolver may answer differently, don't share its results
+            self.cache = (
+                ExpirableCache(512, ttl_dns_cache)
+                if resolver
+                else get_default_dns_cache(ttl_dns_cache)
+            )
+        self._dns_inflight: Dict[Tuple[str, int], Task] = {}
 
     async def acquire(
         self, urlparsed: ParseResult, verify, ssl, timeouts, http2
@@ -70,22 +95,21 @@ class TCPConnector:
         if not urlparsed.hostname:
             raise HttpParsingError("missing hostname")
 
-        # Faster without timeout
-        if not self.timeouts.pool_acquire:
+        # Faster without timeout, and there is no need for it when the
+        # pool has a free connection, acquire won't wait for it. Custom
+        # pools may lack free_conns, those always go through the timeout.
+        free_conns = getattr(self.pool, "free_conns", None)
+        if not self.timeouts.pool_acquire or (free_conns and free_conns()):
             conn = await self.pool.acquire(urlparsed)
-            return await self.after_acquire(
-                urlparsed, conn, verify, ssl, timeouts, http2
-            )
+        else:
+            try:
+                conn = await wait_for(
+                    self.pool.acquire(urlparsed), self.timeouts.pool_acquire
+                )
+            except TimeoutException:
+                raise ConnectionPoolAcquireTimeout()
 
-        try:
-            conn = await wait_for(
-                self.pool.acquire(urlparsed), self.timeouts.pool_acquire
-            )
-            return await self.after_acquire(
-                urlparsed, conn, verify, ssl, timeouts, http2
-            )
-        except TimeoutException:
-            raise ConnectionPoolAcquireTimeout()
+        return await self.after_acquire(urlparsed, conn, verify, ssl, timeouts, http2)
 
     async def after_acquire(self, urlparsed, conn, verify, ssl, timeouts, http2):
 
@@ -119,9 +143,25 @@ class TCPConnector:
         await self.pool.cleanup()
 
     async def __resolve_dns(self, host: str, port: int):
-        key = f"{host}-{port}"
-        dns_data = self.cache.get(key)
+        key = (host, port)
+        cache = self.cache
+        dns_data = cache.get(key) if cache is not None else None
         if not dns_data:
-            dns_data = await self.resolver.resolve(host, port)
-            self.cache.set(key, dns_data)
+            # concurrent lookups of the same host share one resolve call
+            task = self._dns_inflight.get(key)
+            if task is None:
+                task = get_loop().create_task(self.resolver.resolve(host, port))
+                self._dns_inflight[key] = task
+
+                def done(task: Task) -> None:
+                    self._dns_inflight.pop(key, None)
+                    if not task.cancelled():
+                        # all waiters may be cancelled, don't let asyncio
+                        # report the error as never retrieved
+                        task.exception()
+
+                task.add_done_callback(done)
+            dns_data = await shield(task)
+            if cache is not None:
+                cache.set(key, dns_data)
         return random.choice(dns_data)
@@ -1,5 +1,5 @@
 import asyncio
-from typing import TYPE_CHECKING, Awaitable, Optional
+from typing import TYPE_CHECKING, Awaitable, Dict, List, Optional
 
 import h2.events
 
@@ -14,6 +14,20 @@ if TYPE_CHECKING:
     from aiosonic.connection import Connection
 
 
+class _H2ReqState:
+    """State of a single http2 stream request."""
+
+    __slots__ = ("body", "headers", "future", "data_sent", "received")
+
+    def __init__(self, body, headers, future: Awaitable[bytes]):
+        self.body = body
+        self.headers = headers
+        self.future = future
+        self.data_sent = False
+        # response data frames, joined once the stream ends
+        self.received: List[bytes] = []
+
+
 class Http2Handler(object):
     def __init__(self, connection: "Connection"):
         """Initialize."""
@@ -21,32 +35,24 @@ class Http2Handler(object):
         self.connection = connection
         h2conn = connection.h2conn
         assert h2conn
+        assert connection.writer
+        assert connection.reader
+
+        # bound once, these are used on every frame
+        self.h2conn = h2conn
+        self.writer = connection.writer
+        self.reader = connection.reader
 
         loop = asyncio.get_event_loop()
         h2conn.initiate_connection()
 
-        self.requests = {}
+        self.requests: Dict[int, _H2ReqState] = {}
 
         # This reproduces the error in #396, by changing the header table size.
         # h2conn.update_settings({SettingsFrame.HEADER_TABLE_SIZE: 4096})
         self.writer.write(h2conn.data_to_send())
         self.reader_task = loop.create_task(self.reader_t())
 
-    @property
-    def writer(self):
-        assert self.connection.writer
-        return self.connection.writer
-
-    @property
-    def reader(self):
-        assert self.connection.reader
-        return self.connection.reader
-
-    @property
-    def h2conn(self):
-        assert self.connection.h2conn
-        return self.connection.h2conn
-
     def cleanup(self):
         """Cleanup."""
         self.reader_task.cancel()
@@ -62,58 +68,56 @@ class Http2Handler(object):
         headers_param = headers.items() if isinstance(headers, dict) else headers
 
         future: Awaitable[bytes] = asyncio.Future()
-        self.requests[stream_id] = {
-            "body": body,
-            "headers": headers_param,
-            "future": future,
-            "data_sent": False,
-        }
-        await future
-        res = self.requests[stream_id].copy()
-        del self.requests[stream_id]
+        self.requests[stream_id] = _H2ReqState(body, headers_param, future)
+        res_body = await future
+        res = self.requests.pop(stream_id)
 
         response = HttpResponse()
-        for key, val in res["headers"]:
+        for key, val in res.headers:
             if key == b":status":
                 response.response_initial = {"version": b"2", "code": val}
             else:
                 response._set_header(key, val)
 
-        if res["body"]:
-            response._set_body(res["body"])
+        if res_body:
+            response._set_body(res_body)
 
         return response
 
     async def reader_t(self):
         """Reader task."""
         read_size = 16 * 1024
+        # bound once, called for every frame batch
+        read = self.reader.read
+        receive_data = self.h2conn.receive_data
+        handle_events = self.handle_events
+        check_to_write = self.check_to_write
 
         while True:
-            data = await asyncio.wait_for(self.reader.read(read_size), 2)
-            events = self.h2conn.receive_data(data)
+            data = await asyncio.wait_for(read(read_size), 2)
+            events = receive_data(data)
 
             if events:
                 dlogger.debug(("received events", events))
                 try:
-                    await self.handle_events(events)
+                    handle_events(events)
                 except Exception:
                     dlogger.debug("--- Some Exception!", exc_info=True)
                     raise
                 else:
-                    await self.check_to_write()
+                    check_to_write()
 
-    async def handle_events(self, events):
+    def handle_events(self, events):
         """Handle http2 events."""
         h2conn = self.h2conn
 
         for event in events:
             if isinstance(event, h2.events.StreamEnded):
                 dlogger.debug(f"--- exit stream, id: {event.stream_id}")
-                self.requests[event.stream_id]["future"].set_result(
-                    self.requests[event.stream_id]["body"]
-                )
+                req = self.requests[event.stream_id]
+                req.future.set_result(b"".join(req.received))
             elif isinstance(event, h2.events.DataReceived):
-                self.requests[event.stream_id]["body"] += event.data
+                self.requests[event.stream_id].received.append(event.data)
 
                 if (
                     event.stream_id in h2conn.streams
@@ -127,11 +131,11 @@ class Http2Handler(object):
                 if event.flow_controlled_length:
                     h2conn.increment_flow_control_window(event.flow_controlled_length)
             elif isinstance(event, h2.events.ResponseReceived):
-                self.requests[event.stream_id]["headers"] = event.headers
+                self.requests[event.stream_id].headers = event.headers
             elif isinstance(event, h2.events.SettingsAcknowledged):
                 for stream_id, req in self.requests.items():
-                    if not req["data_sent"]:
-                        await self.send_body(stream_id)
+                    if not req.data_sent:
+                        self.send_body(stream_id)
             elif isinstance(
                 event,
                 (
@@ -144,7 +148,7 @@ class Http2Handler(object):
             else:
                 raise MissingEvent(f"another event {event.__class__.__name__}")
 
-    async def check_to_write(self):
+    def check_to_write(self):
         """Writer task."""
         h2conn = self.h2conn
         data_to_send = h2conn.data_to_send()
@@ -153,15 +157,15 @@ class Http2Handler(object):
             dlogger.debug(("writing data", data_to_send))
             self.writer.write(data_to_send)
 
-    async def send_body(self, stream_id):
+    def send_body(self, stream_id):
         def chunks(lst, n):
             """Yield successive n-sized chunks from lst."""
             for i in range(0, len(lst), n):
                 yield lst[i : i + n]
 
         request = self.requests[stream_id]
-        body = request["body"]
-        headers = request["headers"]
+        body = request.body
+        headers = request.headers
         self.h2conn.send_headers(
             stream_id,
             headers,  # , end_stream=True if body else False
@@ -171,4 +175,4 @@ class Http2Handler(object):
         for chunk in chunks(body, to_split):
             self.h2conn.send_data(stream_id, chunk)
 
-        request["data_sent"] = True
+        request.data_sent = True
@@ -1,5 +1,6 @@
 """Pure python HTTP parser."""
 
+from asyncio import IncompleteReadError, LimitOverrunError
 from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List
 from urllib.parse import ParseResult, urlencode, urlparse
 
@@ -11,7 +12,8 @@ from aiosonic.types import BodyType, DataType, ParsedBodyType
 if TYPE_CHECKING:
     from aiosonic import HeadersType
 
-REPLACEABLE_HEADERS = {"host", "user-agent"}
+REPLACEABLE_HEADERS = frozenset(("host", "user-agent"))
+_HEAD_END = b"\r\n\r\n"
 _LRU_CACHE_SIZE = 512
 
 
@@ -25,12 +27,45 @@ def get_url_parsed(url: str) -> ParseResult:
     return urlparse(url)
 
 
+async def read_response_head(connection: Connection) -> List[bytes]:
+    """Read status line and headers of a response, as a list of lines.
+
+    With CRLF line endings the headers are read in one block, falling back
+    to read them line by line if they don't fit in the reader buffer limit.
+    Heads using bare LF line endings are read line by line too.
+    """
+    status_line = await connection.readline()
+    if not status_line:
+        raise IncompleteReadError(status_line, None)
+    lines = [status_line]
+    if not status_line.endswith(b"\r\n"):
+        async for line in parse_headers_iterator(connection):
+            lines.append(line)
+        return lines
+
+    # a head without headers ends right after the status line, where the
+    # block read below would never find its end
+    start = await connection.readexactly(2)
+    if start == b"\r\n":
+        return lines
+    try:
+        head = start + await connection.readuntil(_HEAD_END)
+    except LimitOverrunError:
+        # nothing consumed yet, the block is still in the reader buffer
+        lines.append(start + await connection.readline())
+        async for line in parse_headers_iterator(connection):
+            lines.append(line)
+        return lines
+    lines.extend(head[: -len(_HEAD_END)].split(b"\r\n"))
+    return lines
+
+
 async def parse_headers_iterator(connection: Connection):
     """Transform loop to iterator."""
     while True:
         # StreamReader already buffers data reading so it is efficient.
         res_data = await connection.readline()
-        if b": " not in res_data and b":" not in res_data:
+        if b":" not in res_data:
             break
         yield res_data
 
@@ -5,7 +5,7 @@ from typing import Optional, Union
 
 from aiosonic.resolver import get_loop
 
-RANDOM_RANGE = (1000, 9999)
+RANDOM_RANGE = (10**8, 10**9)
 _CHUNK_SIZE = 1024 * 1024  # 1mb
 
 
@@ -43,6 +43,8 @@ class MultipartForm:
             asyncio.run(upload_file())
     """
 
+    __slots__ = ("fields", "boundary")
+
     def __init__(self):
         """Initializes an empty list for fields and generates a boundary."""
         self.fields = []
@@ -89,14 +91,14 @@ class MultipartForm:
 
     async def _generate_chunks(self):
         """Yields chunks of the multipart buffer containing all fields asynchronously."""
+        delimiter = f"--{self.boundary}\r\n"
         for field in self.fields:
-            yield (f"--{self.boundary}\r\n").encode()
+            # one chunk per field prelude (and per small field value)
             if isinstance(field[1], IOBase):
-                to_write = (
-                    "Content-Disposition: form-data; "
-                    + f'name="{field[0]}"; filename="{field[2]}"\r\n\r\n'
-                )
-                yield to_write.encode()
+                yield (
+                    f"{delimiter}Content-Disposition: form-data; "
+                    f'name="{field[0]}"; filename="{field[2]}"\r\n\r\n'
+                ).encode()
 
                 # Read the file asynchronously
                 async for data in self._read_file(field[1]):
@@ -104,9 +106,9 @@ class MultipartForm:
                 field[1].close()
             else:
                 yield (
-                    f'Content-Disposition: form-data; name="{field[0]}"\r\n\r\n'
+                    f"{delimiter}Content-Disposition: form-data; "
+                    f'name="{field[0]}"\r\n\r\n{field[1]}\r\n'
                 ).encode()
-                yield field[1].encode() + b"\r\n"
 
         yield (f"--{self.boundary}--").encode()
 
@@ -118,19 +120,15 @@ class MultipartForm:
     async def get_body_size(self):
         """Calculates the total size of the multipart body and returns it along with the body itself.
 
-        This function asynchronously constructs the body by iterating over the chunks
-        generated by the get_buffer method. It accumulates the total size of the body
-        in bytes while building the complete body as a byte string.
+        This function asynchronously collects the chunks generated by the get_buffer
+        method and joins them once into the complete body as a byte string.
 
         Returns:
             tuple: A tuple containing the complete multipart body as bytes and its size in bytes.
         """
-        body = b""
-        size = 0
-        async for chunk in self.get_buffer():
-            body += chunk
-            size += len(chunk)
-        return body, size
+        chunks = [chunk async for chunk in self.get_buffer()]
+        body = b"".join(chunks)
+        return body, len(body)
 
     def get_headers(self, size=None):
         """Returns the headers for the multipart form data."""
@@ -1,74 +1,188 @@
 """Pools module."""
 
-from asyncio import Queue, Semaphore
+from abc import ABC, abstractmethod
+from asyncio import CancelledError, Future
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Optional
 from urllib.parse import ParseResult
 
-
-class CyclicQueuePool:
-    """Cyclic queue pool of connections."""
-
-    def __init__(self, connector, pool_size, connection_cls):
+from aiosonic.resolver import get_loop
+
+if TYPE_CHECKING:
+    from aiosonic.connection import Connection
+
+
+class BasePool(ABC):
+    """Base pool of connections.
+
+    Free slots are tracked with a plain counter and a FIFO of waiters, so
+    acquiring a connection while the pool has free ones never yields to
+    the event loop. Subclasses define how connections are stored with
+    :meth:`_pop` and :meth:`_push`.
+
+    If `burst_limit` is given, `pool_size` becomes a soft limit: when all
+    connections are busy, new ones are created up to `burst_limit` instead
+    of waiting, and they are closed on release until the pool is back to
+    `pool_size` connections.
+    """
+
+    def __init__(
+        self,
+        connector,
+        pool_size,
+        connection_cls,
+        burst_limit: Optional[int] = None,
+    ):
+        if burst_limit is not None and burst_limit < pool_size:
+            raise ValueError("burst_limit must be greater or equal to pool_size")
+        self.connector = connector
+        self.connection_cls = connection_cls
         self.pool_size = pool_size
-        self.pool = Queue(pool_size)
-
-        for _ in range(pool_size):
-            self.pool.put_nowait(connection_cls(connector))
+        self.burst_limit = burst_limit
+        self._total = pool_size
+        self._free = pool_size
+        self._waiters: Deque[Future] = deque()
 
-    async def acquire(self, _urlparsed: ParseResult = None):
+    async def acquire(self, urlparsed: ParseResult = None):
         """Acquire connection."""
-        return await self.pool.get()
+        if self._free > 0:
+            self._free -= 1
+            return self._pop(urlparsed)
+
+        if self.burst_limit and self._total < self.burst_limit:
+            self._total += 1
+            return self.connection_cls(self.connector)
+
+        waiter = get_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # a slot was handed to us, give it to the next one
+                self._wakeup()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    # already popped by _wakeup, which skipped it
+                    pass
+            raise
+        return self._pop(urlparsed)
 
-    def release(self, conn):
+    def release(self, conn) -> None:
         """Release connection."""
-        return self.pool.put_nowait(conn)
+        if self._total > self.pool_size and not self._waiters:
+            # shrink back after a burst
+            self._total -= 1
+            conn.close()
+            return
+        self._push(conn)
+        if self._waiters:
+            self._wakeup()
+        else:
+            self._free += 1
+
+    def _wakeup(self) -> None:
+        """Hand a free slot to the first waiter, or count it as free."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._free += 1
 
     def is_all_free(self):
         """Indicates if all pool is free."""
-        return self.pool_size == self.pool.qsize()
+        return self.pool_size == self._free
 
     def free_conns(self) -> int:
-        return self.pool.qsize()
+        return self._free
+
+    @abstractmethod
+    def _pop(self, urlparsed: ParseResult = None) -> "Connection":
+        """Take an idle connection out of the pool."""
+
+    @abstractmethod
+    def _push(self, conn: "Connection") -> None:
+        """Put a released connection back in the pool."""
+
+
+class CyclicQueuePool(BasePool):
+    """Cyclic queue pool of connections."""
+
+    def __init__(self, connector, pool_size, connection_cls, burst_limit=None):
+        super().__init__(connector, pool_size, connection_cls, burst_limit)
+        self.pool: Deque["Connection"] = deque(
+            [connection_cls(connector) for _ in range(pool_size)]
+        )
+
+    def _pop(self, _urlparsed: ParseResult = None) -> "Connection":
+        return self.pool.popleft()
+
+    def _push(self, conn: "Connection") -> None:
+        self.pool.append(conn)
 
     async def cleanup(self):
         """Get all conn and close them, this method let this pool unusable."""
-        for _ in range(self.pool_size):
-            conn = self.pool.get_nowait()
+        while self.pool:
+            conn = self.pool.popleft()
             conn.close()
 
 
-class SmartPool:
-    """Pool which priorizes the reusage of connections."""
-
-    def __init__(self, connector, pool_size, connection_cls):
-        self.pool_size = pool_size
-        self.pool = set()
-        self.sem = Semaphore(pool_size)
+class LifoQueuePool(CyclicQueuePool):
+    """Queue pool of connections which reuses the last released one first.
 
-        for _ in range(pool_size):
-            self.pool.add(connection_cls(connector))
+    Unlike :class:`CyclicQueuePool`, which rotates through all connections,
+    this keeps a small set of connections busy so they stay alive on the
+    server side instead of reaching its idle timeout.
+    """
 
-    async def acquire(self, urlparsed: ParseResult = None):
-        """Acquire connection."""
-        await self.sem.acquire()
-        if urlparsed:
-            key = f"{urlparsed.hostname}-{urlparsed.port}"
-            for item in self.pool:
-                if item.key == key:
-                    self.pool.remove(item)
-                    return item
+    def _pop(self, _urlparsed: ParseResult = None) -> "Connection":
         return self.pool.pop()
 
-    def release(self, conn) -> None:
-        """Release connection."""
-        self.pool.add(conn)
-        self.sem.release()
 
-    def free_conns(self) -> int:
-        return len(self.pool)
+class SmartPool(BasePool):
+    """Pool which priorizes the reusage of connections."""
 
-    def is_all_free(self):
-        """Indicates if all pool is free."""
-        return self.pool_size == self.sem._value
+    def __init__(self, connector, pool_size, connection_cls, burst_limit=None):
+        super().__init__(connector, pool_size, connection_cls, burst_limit)
+        # idle connections not bound to any host yet, and the idle ones
+        # indexed by their `key`. Both are used as stacks, so the most
+        # recently released connection is the first one reused.
+        self.free: Deque["Connection"] = deque(
+            [connection_cls(connector) for _ in range(pool_size)]
+        )
+        self.by_key: Dict[str, Deque["Connection"]] = {}
+
+    def _push(self, conn: "Connection") -> None:
+        if not conn.key:
+            self.free.append(conn)
+            return
+        bucket = self.by_key.get(conn.key)
+        if bucket is None:
+            bucket = self.by_key[conn.key] = deque()
+        bucket.append(conn)
+
+    def _pop(self, urlparsed: ParseResult = None) -> "Connection":
+        if urlparsed:
+            key = f"{urlparsed.hostname}-{urlparsed.port}"
+            bucket = self.by_key.get(key)
+            if bucket:
+                return self._pop_bucket(key, bucket)
+
+        if self.free:
+            return self.free.pop()
+
+        # no unbound connection left, reuse one bound to another host
+        key = next(iter(self.by_key))
+        return self._pop_bucket(key, self.by_key[key])
+
+    def _pop_bucket(self, key: str, bucket: Deque["Connection"]) -> "Connection":
+        conn = bucket.pop()
+        if not bucket:
+            del self.by_key[key]
+        return conn
 
     async def cleanup(self) -> None:
         """Get all conn and close them, this method let this pool unusable."""
@@ -14,5 +14,8 @@ class Proxy:
     def __init__(self, host: str, auth: str = None):
         self.host = host
         self.auth = None
+        #: ready to use `Proxy-Authorization` header value
+        self.auth_header = None
         if auth:
             self.auth = b64encode(auth.encode())
+            self.auth_header = f"Basic {self.auth.decode()}"
@@ -1,9 +1,11 @@
 # copied from aiohttp
 
 import asyncio
+import os
 import socket
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Type, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Type, Union
 
 __all__ = ("ThreadedResolver", "AsyncResolver", "DefaultResolver")
 
@@ -33,9 +35,34 @@ class AbstractResolver(ABC):
         """Release resolver"""
 
 
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the thread pool shared by all ThreadedResolver instances."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=64, thread_name_prefix="aiosonic-dns"
+        )
+    return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    _executor = None
+
+
+if hasattr(os, "register_at_fork"):
+    # worker threads don't survive a fork, the child gets a pool of its own
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
 class ThreadedResolver(AbstractResolver):
-    """Use Executor for synchronous getaddrinfo() calls, which defaults to
-    concurrent.futures.ThreadPoolExecutor.
+    """Use Executor for synchronous getaddrinfo() calls.
+
+    Lookups run in a thread pool shared by all instances, so they don't
+    compete with other work sent to the loop's default executor.
     """
 
     def __init__(self) -> None:
@@ -50,12 +77,15 @@ class ThreadedResolver(AbstractResolver):
     async def resolve(
         self, hostname: str, port: int = 0, family: int = socket.AF_INET
     ) -> List[Dict[str, Any]]:
-        infos = await self.loop.getaddrinfo(
+        infos = await self.loop.run_in_executor(
+            get_executor(),
+            socket.getaddrinfo,
             hostname,
             port,
-            type=socket.SOCK_STREAM,
-            family=family,
-            flags=socket.AI_ADDRCONFIG,
+            family,
+            socket.SOCK_STREAM,
+            0,
+            socket.AI_ADDRCONFIG,
         )
 
         hosts = []
@@ -100,23 +130,47 @@ class AsyncResolver(AbstractResolver):
     async def resolve(
         self, host: str, port: int = 0, family: int = socket.AF_INET
     ) -> List[Dict[str, Any]]:
+        if family != socket.AF_UNSPEC:
+            return await self._resolve(host, port, family)
+
+        # query both families at once instead of one after the other
+        results = await asyncio.gather(
+            self._resolve(host, port, socket.AF_INET),
+            self._resolve(host, port, socket.AF_INET6),
+            return_exceptions=True,
+        )
+        hosts = []
+        for result in results:
+            if isinstance(result, OSError):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            hosts.extend(result)
+
+        if not hosts:
+            raise results[0]
+
+        return hosts
+
+    async def _resolve(self, host: str, port: int, family: int) -> List[Dict[str, Any]]:
         try:
             resp = await self._resolver.gethostbyname(host, family)
         except aiodns.error.DNSError as exc:
             msg = exc.args[1] if len(exc.args) >= 1 else "DNS lookup failed"
             raise OSError(msg) from exc
+        # entries only differ by address, copy them from a single template
+        base = {
+            "hostname": host,
+            "port": port,
+            "family": family,
+            "proto": 0,
+            "flags": socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
+        }
         hosts = []
         for address in resp.addresses:
-            hosts.append(
-                {
-                    "hostname": host,
-                    "host": address,
-                    "port": port,
-                    "family": family,
-                    "proto": 0,
-                    "flags": socket.AI_NUMERICHOST | socket.AI_NUMERICSERV,
-                }
-            )
+            entry = base.copy()
+            entry["host"] = address
+            hosts.append(entry)
 
         if not hosts:
             raise OSError("DNS lookup failed")
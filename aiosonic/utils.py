@@ -1,13 +1,16 @@
 """Utils."""
 import logging
+from typing import Optional
 
-from onecache import CacheDecorator
+
+_debug_logger: Optional[logging.Logger] = None
 
 
-@CacheDecorator()
 def get_debug_logger():
-    """Get debug logger."""
-    logger = logging.getLogger("aiosonic")
-    # logger.setLevel(logging.DEBUG)
-    logger.addHandler(logging.StreamHandler())
-    return logger
+    """Get debug logger, its handler is added only once."""
+    global _debug_logger
+    if _debug_logger is None:
+        _debug_logger = logging.getLogger("aiosonic")
+        # _debug_logger.setLevel(logging.DEBUG)
+        _debug_logger.addHandler(logging.StreamHandler())
+    return _debug_logger
@@ -1,9 +1,14 @@
 import asyncio
+import gc
 import logging
+import os
 import platform
+import socket
 import ssl
+from time import sleep
 from urllib.parse import urlparse
 
+import aiodns
 import pytest
 
 import aiosonic
@@ -22,8 +27,8 @@ from aiosonic.exceptions import (
 )
 from aiosonic.http2 import Http2Handler
 from aiosonic.multipart import MultipartForm
-from aiosonic.pools import CyclicQueuePool
-from aiosonic.resolver import AsyncResolver
+from aiosonic.pools import CyclicQueuePool, LifoQueuePool, SmartPool
+from aiosonic.resolver import AsyncResolver, ThreadedResolver
 from aiosonic.timeout import Timeouts
 
 # setup debug logger
@@ -67,6 +72,22 @@ async def test_simple_get_aiodns(app, aiohttp_server, mocker):
         await server.close()
 
 
+@pytest.mark.asyncio
+async def test_aiodns_resolve_unspec(mocker):
+    """Test aiodns resolver queries both families concurrently."""
+
+    async def foo(_self, host, family):
+        if family == socket.AF_INET6:
+            raise aiodns.error.DNSError(1, "no AAAA records")
+        return mocker.MagicMock(addresses=["127.0.0.1"])
+
+    mocker.patch("aiodns.DNSResolver.gethostbyname", new=foo)
+    resolver = AsyncResolver()
+
+    hosts = await resolver.resolve("localhost", 80, socket.AF_UNSPEC)
+    assert [(h["host"], h["family"]) for h in hosts] == [("127.0.0.1", socket.AF_INET)]
+
+
 @pytest.mark.asyncio
 @pytest.mark.timeout(15)
 async def test_get_python(http2_serv):
@@ -182,6 +203,152 @@ async def test_keep_alive_cyclic_pool(app, aiohttp_server):
             await server.close()
 
 
+@pytest.mark.asyncio
+async def test_keep_alive_lifo_pool(app, aiohttp_server):
+    """Test keepalive lifo pool."""
+    server = await aiohttp_server(app)
+    url = "http://localhost:%d" % server.port
+
+    connector = TCPConnector(
+        pool_size=2, connection_cls=MyConnection, pool_cls=LifoQueuePool
+    )
+    async with aiosonic.HTTPClient(connector) as client:
+        for _ in range(5):
+            res = await client.get(url)
+        async with await connector.pool.acquire() as connection:
+            assert res.status_code == 200
+            assert await res.text() == "Hello, world"
+            assert connection.counter == 5
+            await server.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_acquire_waiters(mocker):
+    """Test released connections are handed to waiters in order."""
+    connector = mocker.MagicMock()
+    pool = CyclicQueuePool(connector, 1, Connection)
+
+    conn = await pool.acquire()
+    assert pool.free_conns() == 0
+
+    cancelled = asyncio.ensure_future(pool.acquire())
+    waiter = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    pool.release(conn)
+    assert await waiter is conn
+    assert not pool.is_all_free()
+
+    pool.release(conn)
+    assert pool.is_all_free()
+
+
+@pytest.mark.asyncio
+async def test_pool_acquire_cancelled_before_release(mocker):
+    """Test a waiter cancelled right before a release doesn't take the slot."""
+    connector = mocker.MagicMock()
+    pool = CyclicQueuePool(connector, 1, Connection)
+
+    conn = await pool.acquire()
+    cancelled = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    pool.release(conn)
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert pool.is_all_free()
+    assert await pool.acquire() is conn
+
+
+@pytest.mark.asyncio
+async def test_pool_burst_limit(mocker):
+    """Test pool opens extra connections up to burst limit."""
+    connector = mocker.MagicMock()
+    pool = SmartPool(connector, 1, lambda _: mocker.MagicMock(key=None), burst_limit=2)
+
+    first = await pool.acquire()
+    burst = await pool.acquire()
+    assert first is not burst
+    assert pool.free_conns() == 0
+
+    pool.release(burst)
+    burst.close.assert_called_once()
+    pool.release(first)
+    assert pool.is_all_free()
+    assert pool.free_conns() == 1
+
+
+@pytest.mark.asyncio
+async def test_dns_resolve_coalesced(mocker):
+    """Test concurrent lookups of the same host do a single resolve."""
+    resolver = mocker.MagicMock()
+    dns_info = {"host": "127.0.0.1", "port": 80}
+
+    async def resolve(*_args):
+        await asyncio.sleep(0.01)
+        return [dns_info]
+
+    resolver.resolve.side_effect = resolve
+    connector = TCPConnector(resolver=resolver)
+    res = await asyncio.gather(
+        connector._TCPConnector__resolve_dns("localhost", 80),
+        connector._TCPConnector__resolve_dns("localhost", 80),
+    )
+    assert res == [dns_info, dns_info]
+    resolver.resolve.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_dns_resolve_error_without_waiters(mocker):
+    """Test a failed lookup nobody waits for anymore is not reported."""
+    resolver = mocker.MagicMock()
+    errors = []
+    asyncio.get_running_loop().set_exception_handler(lambda _, ctx: errors.append(ctx))
+
+    async def resolve(*_args):
+        await asyncio.sleep(0.01)
+        raise OSError("DNS lookup failed")
+
+    resolver.resolve.side_effect = resolve
+    connector = TCPConnector(resolver=resolver)
+    waiter = asyncio.ensure_future(connector._TCPConnector__resolve_dns("foo", 80))
+    await asyncio.sleep(0)
+    task = connector._dns_inflight[("foo", 80)]
+    waiter.cancel()
+    await asyncio.wait([task])
+
+    del task, waiter
+    gc.collect()
+    assert not errors
+    assert not connector._dns_inflight
+
+
+def test_dns_cache_shared():
+    """Test connectors with the default resolver share the dns cache."""
+    assert TCPConnector().cache is TCPConnector().cache
+    assert TCPConnector(ttl_dns_cache=5).cache is not TCPConnector().cache
+    assert TCPConnector(use_dns_cache=False).cache is None
+
+
+@pytest.mark.asyncio
+async def test_dns_resolve_without_cache(mocker):
+    """Test dns resolution with dns cache disabled."""
+    resolver = mocker.MagicMock()
+    dns_info = {"host": "127.0.0.1", "port": 80}
+
+    async def resolve(*_args):
+        return [dns_info]
+
+    resolver.resolve.side_effect = resolve
+    connector = TCPConnector(resolver=resolver, use_dns_cache=False)
+    for _ in range(2):
+        assert await connector._TCPConnector__resolve_dns("localhost", 80) == dns_info
+    assert resolver.resolve.call_count == 2
+
+
 @pytest.mark.asyncio
 async def test_get_with_params(app, aiohttp_server):
     """Test get with params."""
@@ -738,20 +905,16 @@ class WrongEvent:
     pass
 
 
-@pytest.mark.asyncio
 @pytest.mark.timeout(5)
-async def test_http2_wrong_event(mocker):
+def test_http2_wrong_event(mocker):
     """Test json response parsing."""
     mocker.patch("aiosonic.http2.Http2Handler.__init__", lambda x: None)
-    mocker.patch("aiosonic.http2.Http2Handler.h2conn")
 
     handler = Http2Handler()
-
-    async def coro():
-        pass
+    handler.h2conn = mocker.MagicMock()
 
     with pytest.raises(MissingEvent):
-        await handler.handle_events([WrongEvent])
+        handler.handle_events([WrongEvent])
 
 
 @pytest.mark.asyncio
@@ -775,6 +938,27 @@ async def test_wait_connections_empty(mocker):
         assert await client.wait_requests()
 
 
+@pytest.mark.asyncio
+async def test_connector_pool_without_free_conns(mocker):
+    """Test custom pools only need acquire and release."""
+    conn = mocker.MagicMock()
+
+    class MinimalPool:
+        def __init__(self, connector, pool_size, connection_cls):
+            pass
+
+        async def acquire(self, urlparsed=None):
+            return conn
+
+        def release(self, conn):
+            pass
+
+    connector = TCPConnector(pool_cls=MinimalPool, timeouts=Timeouts(pool_acquire=1))
+    connector.after_acquire = mocker.AsyncMock(return_value=conn)
+    urlparsed = urlparse("http://localhost/")
+    assert await connector.acquire(urlparsed, True, None, None, False) is conn
+
+
 @pytest.mark.asyncio
 async def test_wait_connections_busy_timeout(mocker):
     """Test simple get."""
@@ -842,4 +1026,30 @@ async def test_get_with_cookies(app, aiohttp_server):
         # check if server got cookies
         res = await client.get(url)
         assert await res.text() == "Got cookies"
+
+        # also when request headers are given as a dict
+        res = await client.get(url, headers={"x-foo": "bar"})
+        assert await res.text() == "Got cookies"
         await server.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_threaded_resolver_after_fork():
+    """Test lookups work in a child forked after the thread pool started."""
+    asyncio.run(ThreadedResolver().resolve("localhost"))
+    # let the worker go idle, so the child's pool believes it has one
+    sleep(0.1)
+
+    pid = os.fork()
+    if not pid:  # pragma: no cover
+        code = 1
+        try:
+            resolve = ThreadedResolver().resolve("localhost")
+            asyncio.run(asyncio.wait_for(resolve, 5))
+            code = 0
+        finally:
+            os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status)
+    assert os.WEXITSTATUS(status) == 0
@@ -1,9 +1,16 @@
+import asyncio
+
 import pytest
 
 import aiosonic
 from aiosonic import HttpHeaders, HttpResponse
+from aiosonic.connection import (
+    Connection,
+    _get_shared_ssl_context,
+    get_default_ssl_context,
+)
 from aiosonic.exceptions import MissingWriterException
-from aiosonic.http_parser import add_header, add_headers
+from aiosonic.http_parser import add_header, add_headers, read_response_head
 
 
 def test_headers_retrival():
@@ -19,6 +26,11 @@ def test_headers_retrival_common():
     assert HttpHeaders._clear_line(sample_header) == res
 
 
+def test_headers_retrival_no_space():
+    """Test reading header with no space after the first ":" char."""
+    assert HttpHeaders._clear_line(b"X-Time:12:30:00\r\n") == ["X-Time", "12:30:00"]
+
+
 def test_headers_parsing():
     """Test parsing header with no value."""
     parsing = HttpResponse()
@@ -84,6 +96,14 @@ def test_parse_response_line_with_empty_reason():
     assert response.status_code == 200
 
 
+def test_parse_response_line_multiword_reason():
+    """Test parsing response line with a reason-phrase of many words"""
+    response = HttpResponse()
+    response._set_response_initial(b"HTTP/1.0 404 Not Found\r\n")
+    assert response.status_code == 404
+    assert response.response_initial["version"] == "1.0"
+
+
 def test_handle_bad_chunk(mocker):
     """Test handling chunks in chunked request"""
     with pytest.raises(MissingWriterException):
@@ -97,3 +117,75 @@ def test_hostname_parse():
     hostname = "gnosisespaña.es"
     port = 443
     assert aiosonic._get_hostname(hostname, port) == "xn--gnosisespaa-beb.es"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limit", [2**16, 24])
+async def test_read_response_head(mocker, limit):
+    """Test reading status line and headers, also when above reader limit."""
+    connection = Connection(mocker.MagicMock())
+    connection.reader = asyncio.StreamReader(limit=limit)
+    connection.reader.feed_data(
+        b"HTTP/1.1 200 OK\r\nContent-Length: 3\r\nX-Foo: bar\r\n\r\nfoo"
+    )
+
+    lines = await read_response_head(connection)
+    assert [line.rstrip() for line in lines] == [
+        b"HTTP/1.1 200 OK",
+        b"Content-Length: 3",
+        b"X-Foo: bar",
+    ]
+    assert await connection.readexactly(3) == b"foo"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data, size",
+    [
+        (b"HTTP/1.1 200 OK\nContent-Length: 2\nX-Foo: bar\n\nhi", 3),
+        (b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nhi", 2),
+        (b"HTTP/1.1 200 OK\r\n\r\nhi", 1),
+    ],
+)
+async def test_read_response_head_framing(mocker, data, size):
+    """Test reading heads with bare LF line endings, one or no headers."""
+    connection = Connection(mocker.MagicMock())
+    connection.reader = asyncio.StreamReader()
+    connection.reader.feed_data(data)
+    connection.reader.feed_eof()
+
+    lines = await read_response_head(connection)
+    assert len(lines) == size
+    assert lines[0].rstrip() == b"HTTP/1.1 200 OK"
+    assert b"\n" not in b"".join(line.rstrip() for line in lines)
+    assert await connection.read() == b"hi"
+
+
+def test_close_drops_http2_handler(mocker):
+    """Test closing a connection drops its http2 state with the transport."""
+    connection = Connection(mocker.MagicMock())
+    connection.reader = mocker.MagicMock()
+    connection.writer = mocker.MagicMock()
+    connection.h2conn = mocker.MagicMock()
+    handler = connection.h2handler = mocker.MagicMock()
+
+    connection.close()
+    handler.cleanup.assert_called_once()
+    assert connection.h2handler is None
+    assert connection.h2conn is None
+
+
+def test_default_ssl_context_reused():
+    """Test connections share one default ssl context per verify flag."""
+    assert _get_shared_ssl_context() is _get_shared_ssl_context()
+    insecure = _get_shared_ssl_context(verify=False)
+    assert insecure is _get_shared_ssl_context(verify=False)
+    assert insecure is not _get_shared_ssl_context()
+    assert not insecure.check_hostname
+
+
+def test_default_ssl_context_not_shared():
+    """Test users get a new default ssl context they can modify."""
+    context = get_default_ssl_context()
+    assert context is not get_default_ssl_context()
+    assert context is not _get_shared_ssl_context()